@@ -39,15 +39,46 @@ Note that all these comments can only be used at top-level statement.
 """
 import re
 import sys
-import tempfile
-from os import path
+import linecache
+from collections import ChainMap
 from io import StringIO
+from pathlib import Path
 from contextlib import redirect_stdout
 
-
-def printn(line):
-    """Shortcut to print without new line"""
-    print(line, end="")
+# Compiled once at import, since they are used for every line
+# Groups: indent, backticks and language, trailing whitespaces excluded
+CODEBLOCK_FENCE = re.compile(r"^([^\S\n]*)(```[`]*)([\w -]*?)[^\S\n]*$", re.MULTILINE)
+BRACED_VAR = re.compile(r"\{[^}]+\}")
+# {_hidden}, {_exc}, {_exc_msg}, {_expr} and {_out}, the latter two can have
+# a conversion (i.e. {_expr!r})
+SPECIAL_VAR = re.compile(r"\{(?:(_hidden|_exc_msg|_exc)|(_expr|_out)(?:!\w+)?)\}")
+# When multiple of them are in a comment, the first one here wins
+SPECIAL_VAR_PRIORITY = ("_hidden", "_expr", "_out", "_exc", "_exc_msg")
+
+# Code objects by their sources, so that repeated pieces (i.e. the same
+# `{_exc}` wrapper) are only compiled once
+COMPILED_CODES = {}
+
+
+def compile_source(code, sourcefile):
+    """Compile the code, reusing the code object if the same source
+    has been compiled before
+
+    The source is registered in linecache instead of being written to a real
+    file, which is enough for it to be visible at runtime. A cached code
+    object keeps the sourcefile of its first compilation, whose linecache
+    entry holds exactly the same source.
+    """
+    compiled = COMPILED_CODES.get(code)
+    if compiled is None:
+        linecache.cache[sourcefile] = (
+            len(code),
+            None,
+            code.splitlines(keepends=True),
+            sourcefile,
+        )
+        compiled = COMPILED_CODES[code] = compile(code, sourcefile, "exec")
+    return compiled
 
 
 class CodeBlock:
@@ -68,76 +99,81 @@ class CodeBlock:
         lang: See Args
         index: See Args
         envs: See Args
-        codes: The accumulated codes to execute
-        produced: The produced output
-        alive: Whether this codeblock is still alive/open
+        codes: The accumulated lines of codes to execute
+        produced: The produced lines of output
         piece: The piece index of the code to be executed in this block
         stdout: The standard output of current code piece
             It will get overwritten by next code piece
+        sio: The buffer to capture the stdout, reused by all code pieces
     """
 
     def __init__(self, indent, backticks, lang, index, envs=None):
         self.indent = indent
         self.backticks = backticks
         self.lang = lang
-        self.codes = ""
-        self.envs = envs or {}
-        self.produced = ""
-        self.alive = True
+        self.codes = []
+        self.envs = envs if envs is not None else {}
+        # what exec() would insert on the first run anyway
+        self.envs.setdefault("__builtins__", __builtins__)
+        self.produced = []
         self.index = index
         self.piece = 0
-        self.stdout = ""
+        self.sio = StringIO()
+
+    @property
+    def stdout(self):
+        """The standard output of current code piece
+
+        Only read from the buffer when it is used (i.e. by `{_out}`)
+        """
+        return self.sio.getvalue()
 
     def compile_exec(self, code):
-        """Compile and execute the code"""
-        sourcefile = path.join(
-            tempfile._get_default_tempdir(),
-            f"codeblock_{self.index}_{self.piece}-"
-            f"{next(tempfile._get_candidate_names())}",
-        )
-        with open(sourcefile, "w") as fsrc:
-            fsrc.write(code)
-        code = compile(code, sourcefile, mode="exec")
-        sio = StringIO()
-        with redirect_stdout(sio):
+        """Compile and execute the code
+
+        The stdout is always captured, so that nothing leaks into the README
+        """
+        code = compile_source(code, f"<codeblock_{self.index}_{self.piece}>")
+        self.sio.seek(0)
+        self.sio.truncate()
+        with redirect_stdout(self.sio):
             exec(code, self.envs)
-        self.stdout = sio.getvalue()
         self.piece += 1
 
     def feed(self, line):
         """Feed a single line to the code block, with line break"""
         if self.lang not in ("python", "python3"):
-            self.produced += line
+            self.produced.append(line)
 
         else:
             if not line.strip():  # empty line
-                self.codes += "\n"
-                self.produced += line
+                self.codes.append("\n")
+                self.produced.append(line)
             else:
                 line = line[len(self.indent) :]
                 if CodeBlock.should_compile(line):
                     if self.codes:
-                        self.compile_exec(self.codes)
-                        self.codes = ""
-                    self.produced += self.indent + self.compile_line(line)
+                        self.compile_exec("".join(self.codes))
+                        self.codes.clear()
+                    self.produced.append(self.indent + self.compile_line(line))
                 else:
-                    self.codes += line
-                    self.produced += self.indent + line
+                    self.codes.append(line)
+                    self.produced.append(self.indent + line)
 
     def _compile_expr(self, line):
         """Compile {_expr}"""
         varname = "_expr"
         source = f"{varname} = {line}"
         self.compile_exec(source)
-        code, comment = line.split("#", 1)
-        comment = comment.format(**self.envs)
+        code, _, comment = line.partition("#")
+        comment = comment.format_map(self.envs)
         return "#".join((code, comment))
 
     def _compile_out(self, line):
         """Compile {_out}"""
         self.compile_exec(line)
-        code, comment = line.split("#", 1)
-        comment = comment.format(**self.envs, _out=self.stdout)
+        code, _, comment = line.partition("#")
+        comment = comment.format_map(ChainMap({"_out": self.stdout}, self.envs))
         return "#".join((code, comment))
 
     def _compile_exc(self, line, msg=False):
@@ -155,10 +191,14 @@ class CodeBlock:
             source += " + ': ' + str(exc)"
         source += "\n"
         self.compile_exec(source)
-        code, comment = line.split("#", 1)
-        comment = comment.format(**self.envs)
+        code, _, comment = line.partition("#")
+        comment = comment.format_map(self.envs)
         return "#".join((code, comment))
 
+    def _compile_exc_msg(self, line):
+        """Compile {_exc_msg}"""
+        return self._compile_exc(line, msg=True)
+
     def _compile_hidden(self, line):
         """Compile {_hidden}"""
         self.compile_exec(line)
@@ -167,96 +207,94 @@ class CodeBlock:
     def _compile_var(self, line):
         """Compile variables"""
         self.compile_exec(line)
-        code, comment = line.split("#", 1)
-        comment = comment.format(**self.envs)
+        code, _, comment = line.partition("#")
+        comment = comment.format_map(self.envs)
         return "#".join((code, comment))
 
     def compile_line(self, line):
         """Compile a single line"""
-        code, comment = line.split("#", 1)
+        code, _, comment = line.partition("#")
         if not code:
-            return "#" + comment.format(**self.envs, _out=self.stdout)
-        if "{_hidden}" in comment:
-            return self._compile_hidden(line)
-        if re.search(r"\{_expr(?:!\w+)?\}", comment):
-            return self._compile_expr(line)
-        if re.search(r"\{_out(?:!\w+)?\}", comment):
-            return self._compile_out(line)
-        if "{_exc}" in comment:
-            return self._compile_exc(line)
-        if "{_exc_msg}" in comment:
-            return self._compile_exc(line, msg=True)
+            return "#" + comment.format_map(
+                ChainMap({"_out": self.stdout}, self.envs)
+            )
+        specials = {
+            special.group(1) or special.group(2)
+            for special in SPECIAL_VAR.finditer(comment)
+        }
+        for kind in SPECIAL_VAR_PRIORITY:
+            if kind in specials:
+                return getattr(self, f"_compile{kind}")(line)
 
         return self._compile_var(line)
 
     def produce(self):
         """Return the produced output"""
-        return self.produced
+        return "".join(self.produced)
 
-    @classmethod
-    def try_open(cls, line, envs, index):
-        """Check if a codeblock starts, if so returns the indent,
-        backtick number and language, otherwise returns False
-
-        >>> _codeblock_starts("")
-        >>> # False
-        >>> _codeblock_starts("  ```python")
-        >>> # ("  ", 3, "python")
-        """
-        line = line.rstrip()
-        matches = re.match(r"(^\s*)(```[`]*)([\w -]*)$", line)
-        if not matches:
-            return None
-
-        indent, backticks, lang = (
-            matches.group(1),
-            matches.group(2),
-            matches.group(3),
-        )
-        return cls(indent, backticks, lang, index, envs)
-
-    def close(self, line):
-        """Try to close the codeblock"""
-        line = line.rstrip()
-        if line == f"{self.indent}{self.backticks}":
-            self.alive = False
-            if self.codes and "{" in self.codes and "}" in self.codes:
-                self.compile_exec(self.codes)
-                self.codes = ""
-            return True
-
-        return False
+    def close(self):
+        """Close the codeblock, executing the leftover codes if needed"""
+        codes = "".join(self.codes)
+        if "{" in codes and "}" in codes:
+            self.compile_exec(codes)
+            self.codes.clear()
 
     @staticmethod
     def should_compile(line):
         """Whether we should compile a line or treat it as a plain line"""
-        if "#" not in line:
+        # Most lines have neither of them, skip the regex
+        if "#" not in line or "{" not in line:
             return False
 
-        comment = line.split("#", 1)[1]
-        return re.search(r"\{[^}]+\}", comment)
+        return BRACED_VAR.search(line.partition("#")[2]) is not None
 
 
 def compile_readme(rawfile):
-    """Compile the raw file line by line"""
+    """Compile the raw file
 
+    The fences are located in one pass over the whole file. Text outside of
+    the codeblocks is kept as is, only lines inside are fed to the codeblocks.
+    """
+    text = Path(rawfile).read_text()
     codeblock = None
-
-    with open(rawfile) as fraw:
-        for line in fraw:
-            if codeblock and codeblock.alive:
-                if codeblock.close(line):
-                    printn(codeblock.produce())
-                    printn(line)
-                else:
-                    codeblock.feed(line)
-            else:
-                printn(line)
-                envs = codeblock.envs if codeblock else None
-                index = codeblock.index + 1 if codeblock else 0
-                maybe_codeblock = CodeBlock.try_open(line, envs, index)
-                if maybe_codeblock:
-                    codeblock = maybe_codeblock
+    envs = None
+    index = 0
+    # End of the last fence line processed
+    pos = 0
+    # Text is buffered and written once for each codeblock
+    output = []
+
+    for fence in CODEBLOCK_FENCE.finditer(text):
+        # include the line break
+        end = fence.end() + 1
+        line = text[fence.start() : end]
+        if codeblock is None:
+            output.append(text[pos:end])
+            codeblock = CodeBlock(*fence.groups(), index, envs)
+            pos = end
+            continue
+
+        if fence.groups() != (codeblock.indent, codeblock.backticks, ""):
+            # Not the closing fence, i.e. "```python" in a "````markdown" block
+            continue
+
+        for codeline in text[pos : fence.start()].splitlines(keepends=True):
+            codeblock.feed(codeline)
+        codeblock.close()
+        output.append(codeblock.produce())
+        output.append(line)
+        sys.stdout.write("".join(output))
+        output.clear()
+
+        envs = codeblock.envs
+        index = codeblock.index + 1
+        codeblock = None
+        pos = end
+
+    # An unclosed codeblock is kept as is
+    output.append(text[pos:])
+    sys.stdout.write("".join(output))
+    sys.stdout.flush()
 
 
 if __name__ == "__main__":
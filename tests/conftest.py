@@ -11,18 +11,19 @@ import pytest
 from varname import config, ignore
 
 
+def _getframe_fail(_context):
+    raise ValueError
+
+
 @pytest.fixture
 def no_getframe():
     """
     Monkey-patch sys._getframe to fail,
     simulating environments that don't support varname
     """
-    def getframe(_context):
-        raise ValueError
-
     orig_getframe = sys._getframe
     try:
-        sys._getframe = getframe
+        sys._getframe = _getframe_fail
         yield
     finally:
         sys._getframe = orig_getframe
@@ -55,12 +56,8 @@ def no_pure_eval():
 
 
 @pytest.fixture
-def enable_debug():
-    config.debug = True
-    try:
-        yield
-    finally:
-        config.debug = False
+def enable_debug(monkeypatch):
+    monkeypatch.setattr(config, "debug", True)
 
 
 @pytest.fixture
@@ -74,11 +71,7 @@ def frame_matches_module_by_ignore_id_false():
 
 
 def run_async(coro):
-    if sys.version_info < (3, 7):
-        loop = asyncio.get_event_loop()
-        return loop.run_until_complete(coro)
-    else:
-        return asyncio.run(coro)
+    return asyncio.run(coro)
 
 
 def module_from_source(name, source, tmp_path):
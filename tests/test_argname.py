@@ -1,4 +1,6 @@
+import gc
 import textwrap
+import weakref
 from functools import singledispatch
 
 import pytest
@@ -96,7 +98,19 @@ def test_argname_argname_argument_non_variable():
         return argname(1)
 
     x = y = z = 1
-    with pytest.raises(TypeError, match="expected string or bytes-like object"):
+    with pytest.raises(TypeError, match="argument names must be str, got 'int'"):
+        func(x, y, z)
+
+    def func(a, b, c, d=4):
+        return argname(b"a")
+
+    with pytest.raises(TypeError, match="must be str, got 'bytes'"):
+        func(x, y, z)
+
+    def func(a, b, c, d=4):
+        return argname("a", ["b"])
+
+    with pytest.raises(TypeError, match="must be str, got 'list'"):
         func(x, y, z)
 
 
@@ -256,6 +270,49 @@ def test_argname_varpos_arg():
     assert names == ({}, "x")
 
 
+def test_argname_cached_call_site():
+    def func(a, **kwargs):
+        return argname("a", "kwargs")
+
+    def func2(b, **kwargs):
+        return argname("b", "kwargs")
+
+    x = y = 1
+    # same call site with different functions
+    for f in (func, func, func2):
+        names = f(x, kw=y)
+        assert names == ("x", {"kw": "y"})
+        # should not affect the cached sources
+        names[1].clear()
+
+
+def test_argname_cached_function_not_retained():
+    def outer():
+        def func(a):
+            return argname("a")
+
+        class Klass:
+            def method(self, a):
+                return argname("a")
+
+        return func, Klass().method
+
+    def call(func):
+        x = 1
+        return func(x)
+
+    func, method = outer()
+    assert call(func) == "x"
+    assert call(method) == "x"
+    refs = weakref.ref(func), weakref.ref(method.__func__)
+    del func, method
+
+    # replace the frame (holding the functions) attached to the call site
+    assert call(outer()[0]) == "x"
+    gc.collect()
+    assert [ref() for ref in refs] == [None, None]
+
+
 def test_argname_nosuch_varpos_arg():
     def func(a, *args):
         another = []  # noqa F841
@@ -328,6 +385,8 @@ def test_argname_nosucharg():
 
 
 def test_argname_subscript_star():
+    xy = 2
+
     def func1(*args, **kwargs):
         return argname("args[0]", "kwargs[x]")
 
@@ -341,6 +400,12 @@ def test_argname_subscript_star():
     out = func2(x, y)
     assert out == ("x", "y")
 
+    def func3(*args, kw=None):
+        return argname("*args", "kw")
+
+    out = func3(x, y, kw=xy)
+    assert out == ("x", "y", "xy")
+
 
 def test_argname_nonvar():
     def func(x):
@@ -1,10 +1,13 @@
 import sys
+import weakref
 
 import pytest
 from varname import varname
 from varname.utils import MaybeDecoratedFunctionWarning, VarnameRetrievingError
 from varname.helpers import Wrapper, debug, jsobj, register, exec_code
 
+SELF = sys.modules[__name__]
+
 
 def test_wrapper():
 
@@ -32,6 +35,9 @@ def test_wrapper():
     assert val3.name == "val3"
     assert val3.value is True
 
+    # can be weakly referenced
+    assert weakref.ref(val3)() is val3
+
 
 def test_debug(capsys):
     a = 1
@@ -62,7 +68,7 @@ def test_register_to_class():
         return foo.__varname__
 
     @register(
-        ignore=[(sys.modules[__name__], wrapped.__qualname__)],
+        ignore=[(SELF, wrapped.__qualname__)],
     )
     class Foo:
         def __init__(self):
@@ -131,7 +137,7 @@ def test_register_to_function():
     def func3():
         return func4()
 
-    @register(ignore=[(sys.modules[__name__], func3.__qualname__)])
+    @register(ignore=[(SELF, func3.__qualname__)])
     def func4():
         return __varname__  # noqa # pyright: ignore
 
@@ -161,3 +167,15 @@ def test_exec_code(tmp_path):
 
     exec_code(code, globals(), locs, sourcefile=tmp_path / "test.py")
     assert locs["f1"] == "f1"
+    del locs["f1"]
+
+    # compiled code reused
+    exec_code(code, globals(), locs, sourcefile=tmp_path / "test.py")
+    assert locs["f1"] == "f1"
+
+    # annotations are not evaluated, with or without a sourcefile
+    code = "x: UndefinedName = 1"
+    exec_code(code, {}, locs)
+    assert locs["x"] == 1
+    exec_code(code, {}, locs, sourcefile=tmp_path / "test2.py")
+    assert locs["__annotations__"]["x"] == "UndefinedName"
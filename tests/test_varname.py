@@ -1,20 +1,26 @@
+import gc
 import sys
-import subprocess
+import weakref
 from functools import wraps
+from typing import Generic, TypeVar
 
 import pytest
 from executing import Source
 from varname import varname
+from varname.helpers import exec_code
 from varname.utils import (
     VarnameRetrievingError,
     QualnameNonUniqueError,
     ImproperUseError,
     MaybeDecoratedFunctionWarning,
     MultiTargetAssignmentWarning,
+    cached_realpath,
     get_node,
+    warn_at_frame,
 )
 
 
+from . import conftest
 from .conftest import run_async, module_from_source
 
 SELF = sys.modules[__name__]
@@ -195,16 +201,44 @@ def test_named_expr():
     assert a == ["b", "c"]
 
 
-def test_multiple_targets():
+def test_multiple_targets(tmp_path):
 
     def function():
         return varname()
 
     with pytest.warns(
         MultiTargetAssignmentWarning, match="Multiple targets in assignment"
-    ):
+    ) as record:
         y = x = function()
     assert y == x == "x"
+    # warned at the assignment
+    assert record[0].filename == __file__
+
+    # globals without __name__
+    sourcefile = tmp_path / "multiple_targets.py"
+    locs = {}
+    with pytest.warns(
+        MultiTargetAssignmentWarning, match="Multiple targets in assignment"
+    ) as record:
+        exec_code(
+            "b = a = function()",
+            {"function": function},
+            locs,
+            sourcefile=sourcefile,
+        )
+    assert locs["b"] == locs["a"] == "a"
+    assert record[0].filename == str(sourcefile)
+
+
+def test_warn_at_frame_without_module_name():
+    code = compile(
+        "warn_at_frame('no module name', UserWarning, sys._getframe())",
+        "<no_module_name>",
+        "exec",
+    )
+    with pytest.warns(UserWarning, match="no module name") as record:
+        exec(code, {"warn_at_frame": warn_at_frame, "sys": sys})
+    assert record[0].filename == "<no_module_name>"
 
 
 def test_subscript():
@@ -415,13 +449,8 @@ def test_ignore_module_qualname(tmp_path, capsys, enable_debug):
     assert f == "f"
 
 
-def test_ignore_filename_qualname():
+def test_ignore_filename_qualname(capsys, enable_debug):
     source = (
-        "import sys\n"
-        "import __main__\n"
-        "import varname\n"
-        "varname.config.debug = True\n"
-        "from varname import varname\n"
         "def func(): \n"
         "  return varname(ignore=[\n"
         '     ("unknown", "wrapped"), \n'  # used to trigger filename mismatch
@@ -432,19 +461,13 @@ def test_ignore_filename_qualname():
         "variable = wrapped()\n"
     )
 
-    # code = compile(source, '<string>', 'exec')
-    # # ??? NameError: name 'func' is not defined
-    # exec(code)
+    # run it as if it is from stdin, where the source is not available
+    code = compile(source, "<stdin>", "exec")
+    with pytest.raises(VarnameRetrievingError):
+        exec(code, {"varname": varname})
 
-    p = subprocess.Popen(
-        [sys.executable],
-        stdin=subprocess.PIPE,
-        stdout=subprocess.PIPE,
-        stderr=subprocess.STDOUT,
-        encoding="utf8",
-    )
-    out, _ = p.communicate(input=source)
-    assert "Ignored by IgnoreFilenameQualname('<stdin>', 'wrapped')" in out
+    err = capsys.readouterr().err
+    assert "Ignored by IgnoreFilenameQualname('<stdin>', 'wrapped')" in err
 
 
 def test_ignore_function_warning():
@@ -469,6 +492,32 @@ def test_ignore_function_warning():
     ):
         f = func1()  # noqa: F841
 
+    # warned again, not suppressed for the same function
+    with pytest.warns(MaybeDecoratedFunctionWarning):
+        g = func1()
+    assert g == "g"
+
+
+def test_ignore_local_function_not_retained():
+    def outer():
+        def func():
+            return func2()
+
+        def func2():
+            return varname(ignore=func)
+
+        return func
+
+    func = outer()
+    with pytest.warns(MaybeDecoratedFunctionWarning):
+        f = func()
+    assert f == "f"
+
+    ref = weakref.ref(func)
+    del func
+    gc.collect()
+    assert ref() is None
+
 
 def test_ignore_decorated():
     def my_decorator(f):
@@ -516,6 +565,66 @@ def test_ignore_dirname(tmp_path):
     assert f == "f"
 
 
+def test_realpath_relative_after_chdir(tmp_path, monkeypatch):
+    for dirname in ("a", "b"):
+        (tmp_path / dirname).mkdir()
+        monkeypatch.chdir(tmp_path / dirname)
+        assert cached_realpath("x.py") == str(
+            (tmp_path / dirname / "x.py").resolve()
+        )
+
+
+def test_ignore_relative_dirname_after_chdir(tmp_path, monkeypatch):
+    for dirname in ("a", "b"):
+        libdir = tmp_path / dirname / "lib"
+        libdir.mkdir(parents=True)
+        module = module_from_source(
+            f"relative_dirname_{dirname}",
+            """
+            from varname import varname
+            def bar():
+                return varname(ignore="lib")
+            """,
+            libdir,
+        )
+        monkeypatch.chdir(tmp_path / dirname)
+
+        def foo():
+            return module.bar()
+
+        f = foo()
+        assert f == "f"
+
+
+def test_ignore_bound_method_not_retained(tmp_path):
+    module = module_from_source(
+        "ignore_bound_method",
+        """
+        from varname import varname
+        class Klass:
+            def method(self):
+                return self.func()
+            def func(self):
+                return varname(ignore=self.method)
+        """,
+        tmp_path,
+    )
+
+    def call(obj):
+        k = obj.method()
+        return k
+
+    obj = module.Klass()
+    assert call(obj) == "k"
+    ref = weakref.ref(obj)
+    del obj
+
+    # replace the frame (holding the instance) attached to the call site
+    assert call(module.Klass()) == "k"
+    gc.collect()
+    assert ref() is None
+
+
 def test_type_anno_varname():
 
     class Foo:
@@ -527,8 +636,6 @@ def test_type_anno_varname():
 
 
 def test_generic_type_varname():
-    from typing import Generic, TypeVar
-
     T = TypeVar("T")
 
     class Foo(Generic[T]):
@@ -548,8 +655,6 @@ def test_generic_type_varname():
 
 
 def test_async_varname():
-    from . import conftest
-
     async def func():
         return varname(ignore=(conftest, "run_async"))
 
@@ -592,6 +697,13 @@ def test_invalid_ignores():
         return varname(ignore=(1, "2"))
 
     with pytest.raises(ValueError):
+        f = func()
+
+    # unhashable, can't be cached
+    def func():
+        return varname(ignore=[{1}])
+
+    with pytest.raises(ValueError, match="Unexpected ignore item"):
         f = func()  # noqa: F841
 
 
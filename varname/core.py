@@ -1,20 +1,18 @@
 """Provide core features for varname"""
 from __future__ import annotations
 import ast
-import re
-import warnings
 from typing import List, Union, Tuple, Type, Callable, overload
 
-from executing import Source
-
 from .utils import (
     get_node,
     get_node_by_frame,
     lookfor_parent_assign,
     node_name,
-    get_argument_sources,
+    get_argument_sources_by_frame,
     get_function_called_argname,
+    parse_argname_arg,
     rich_exc_message,
+    warn_at_frame,
     reconstruct_func_node,
     ArgSourceType,
     VarnameRetrievingError,
@@ -121,10 +119,11 @@ def varname(
         # Need to actually check that there's just one
         # give warnings if: a = b = func()
         if len(node.targets) > 1:
-            warnings.warn(
+            warn_at_frame(
                 "Multiple targets in assignment, variable name "
                 "on the very right is used. ",
                 MultiTargetAssignmentWarning,
+                refnode.__frame__,
             )
         target = node.targets[-1]
     else:
@@ -343,8 +342,8 @@ def argname(
     # >>>   a_name = argname(a)
     # >>>   b_name = argname(b)
     try:
-        argument_sources = get_argument_sources(
-            Source.for_frame(func_frame),
+        argument_sources = get_argument_sources_by_frame(
+            func_frame,
             func_node,
             func,
             vars_only=vars_only,
@@ -355,22 +354,16 @@ def argname(
         ) from err
 
     out: List[ArgSourceType] = []
-    farg_star = False
+    any_star = False
     for farg in (arg, *more_args):
+        # before the cached parse_argname_arg(), which needs them hashable
+        if not isinstance(farg, str):
+            raise TypeError(
+                f"argument names must be str, got {type(farg).__name__!r}"
+            )
 
-        farg_name = farg
-        farg_subscript = None  # type: str | int
-        match = re.match(r"^([\w_]+)\[(.+)\]$", farg)
-        if match:
-            farg_name = match.group(1)
-            farg_subscript = match.group(2)
-            if farg_subscript.isdigit():
-                farg_subscript = int(farg_subscript)
-        else:
-            match = re.match(r"^\*([\w_]+)$", farg)
-            if match:
-                farg_name = match.group(1)
-                farg_star = True
+        farg_name, farg_subscript, farg_star = parse_argname_arg(farg)
+        any_star = any_star or farg_star
 
         if farg_name not in argument_sources:
             raise ImproperUseError(
@@ -399,11 +392,14 @@ def argname(
             out.append(source[farg_subscript])  # type: ignore
         elif farg_star:
             out.extend(source)
+        elif isinstance(source, dict):
+            # argument_sources is cached, don't give it away
+            out.append(dict(source))
         else:
             out.append(source)
 
     return (
         out[0]
-        if not more_args and not farg_star
+        if not more_args and not any_star
         else tuple(out)  # type: ignore
     )
@@ -6,7 +6,7 @@ from functools import partial, wraps
 from os import PathLike
 from typing import Any, Callable, Dict, Tuple, Type, Union
 
-from .utils import IgnoreType
+from .utils import IgnoreType, cached_compile
 from .ignore import IgnoreList
 from .core import argname, varname
 
@@ -126,6 +126,8 @@ class Wrapper:
         value: The value this wrapper wraps
     """
 
+    __slots__ = ("name", "value", "__weakref__")
+
     def __init__(
         self,
         value: Any,
@@ -234,8 +236,9 @@ def debug(
     if merge:
         print(f"{prefix}{', '.join(name_and_values)}")
     else:
-        for name_and_value in name_and_values:
-            print(f"{prefix}{name_and_value}")
+        print("\n".join(
+            f"{prefix}{name_and_value}" for name_and_value in name_and_values
+        ))
 
 
 def exec_code(
@@ -288,10 +291,13 @@ def exec_code(
         ) as f:
             f.write(code)
             sourcefile = f.name
+        codeobj = compile(code, sourcefile, "exec")
     else:
         sourcefile = str(sourcefile)
         with open(sourcefile, "w") as f:
             f.write(code)
+        # Same code in the same file, no need to compile it again
+        codeobj = cached_compile(code, sourcefile)
 
     if globals is None or locals is None:
         ignore_list = IgnoreList.create(ignore)
@@ -302,7 +308,7 @@ def exec_code(
             locals = frame_info.f_locals
 
     try:
-        exec(compile(code, sourcefile, "exec"), globals, locals, **kwargs)
+        exec(codeobj, globals, locals, **kwargs)
     finally:
         import os
 
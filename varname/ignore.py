@@ -18,14 +18,12 @@ Any frames in `varname`, standard libraries, and frames of any expressions like
 
 """
 import sys
-import inspect
-import warnings
 from os import path
 from pathlib import Path
-from fnmatch import fnmatch
 from abc import ABC, abstractmethod
-from typing import List, Union
-from types import FrameType, ModuleType, FunctionType
+from functools import lru_cache
+from typing import List, Tuple, Union
+from types import FrameType, ModuleType, FunctionType, MethodType
 
 from executing import Source
 
@@ -40,12 +38,15 @@ else:
 from .utils import (
     IgnoreElemType,
     IgnoreType,
-    MaybeDecoratedFunctionWarning,
     cached_getmodule,
+    cached_realpath,
     attach_ignore_id_to_module,
     frame_matches_module_by_ignore_id,
     check_qualname_by_source,
+    get_source_by_frame,
+    qualname_matcher,
     debug_ignore_frame,
+    warn_if_maybe_decorated,
 )
 
 
@@ -80,7 +81,7 @@ class IgnoreElem(ABC):
         """Setups after __init__"""
 
     @abstractmethod
-    def match(self, frame_no: int, frameinfos: List[inspect.FrameInfo]) -> bool:
+    def match(self, frame_no: int, frames: List[FrameType]) -> bool:
         """Whether the frame matches the ignore element"""
 
     def __repr__(self) -> str:
@@ -101,8 +102,8 @@ class IgnoreModule(IgnoreElem, attrs=["module"]):
     def _post_init(self) -> None:
         attach_ignore_id_to_module(self.module)
 
-    def match(self, frame_no: int, frameinfos: List[inspect.FrameInfo]) -> bool:
-        frame = frameinfos[frame_no].frame
+    def match(self, frame_no: int, frames: List[FrameType]) -> bool:
+        frame = frames[frame_no]
         module = cached_getmodule(frame.f_code)
         if module:
             return (
@@ -116,11 +117,11 @@ class IgnoreModule(IgnoreElem, attrs=["module"]):
 class IgnoreFilename(IgnoreElem, attrs=["filename"]):
     """Ignore calls from a module by matching its filename"""
 
-    def match(self, frame_no: int, frameinfos: List[inspect.FrameInfo]) -> bool:
-        frame = frameinfos[frame_no].frame
+    def match(self, frame_no: int, frames: List[FrameType]) -> bool:
+        frame = frames[frame_no]
 
         # in case of symbolic links
-        return path.realpath(frame.f_code.co_filename) == path.realpath(
+        return cached_realpath(frame.f_code.co_filename) == cached_realpath(
             self.filename
         )
 
@@ -133,14 +134,14 @@ class IgnoreDirname(IgnoreElem, attrs=["dirname"]):
     def _post_init(self) -> None:
 
         # Path object will turn into str here
-        self.dirname = path.realpath(self.dirname)  # type: str
+        self.dirname = cached_realpath(self.dirname)  # type: str
 
         if not self.dirname.endswith(path.sep):
             self.dirname = f"{self.dirname}{path.sep}"
 
-    def match(self, frame_no: int, frameinfos: List[inspect.FrameInfo]) -> bool:
-        frame = frameinfos[frame_no].frame
-        filename = path.realpath(frame.f_code.co_filename)
+    def match(self, frame_no: int, frames: List[FrameType]) -> bool:
+        frame = frames[frame_no]
+        filename = cached_realpath(frame.f_code.co_filename)
 
         return filename.startswith(self.dirname)
 
@@ -151,10 +152,10 @@ class IgnoreStdlib(IgnoreDirname, attrs=["dirname"]):
     But we need to ignore 3rd-party packages under site-packages/.
     """
 
-    def match(self, frame_no: int, frameinfos: List[inspect.FrameInfo]) -> bool:
-        frame = frameinfos[frame_no].frame
+    def match(self, frame_no: int, frames: List[FrameType]) -> bool:
+        frame = frames[frame_no]
         third_party_lib = f"{self.dirname}site-packages{path.sep}"
-        filename = path.realpath(frame.f_code.co_filename)
+        filename = cached_realpath(frame.f_code.co_filename)
 
         return (
             filename.startswith(self.dirname)
@@ -164,33 +165,23 @@ class IgnoreStdlib(IgnoreDirname, attrs=["dirname"]):
 
 
 class IgnoreFunction(IgnoreElem, attrs=["func"]):
-    """Ignore a non-decorated function"""
+    """Ignore a non-decorated function
 
-    def _post_init(self) -> None:
-        if (
-            # without functools.wraps
-            "<locals>" in self.func.__qualname__
-            or self.func.__name__ != self.func.__code__.co_name
-        ):
-            warnings.warn(
-                f"You asked varname to ignore function {self.func.__name__!r}, "
-                "which may be decorated. If it is not intended, you may need "
-                "to ignore all intermediate frames with a tuple of "
-                "the function and the number of its decorators.",
-                MaybeDecoratedFunctionWarning,
-            )
+    Whether the function may be decorated is checked by `IgnoreList.create()`
+    every time, since the elements themselves can be cached.
+    """
 
-    def match(self, frame_no: int, frameinfos: List[inspect.FrameInfo]) -> bool:
-        frame = frameinfos[frame_no].frame
+    def match(self, frame_no: int, frames: List[FrameType]) -> bool:
+        frame = frames[frame_no]
         return frame.f_code == self.func.__code__
 
 
 class IgnoreDecorated(IgnoreElem, attrs=["func", "n_decor"]):
     """Ignore a decorated function"""
 
-    def match(self, frame_no: int, frameinfos: List[inspect.FrameInfo]) -> bool:
+    def match(self, frame_no: int, frames: List[FrameType]) -> bool:
         try:
-            frame = frameinfos[frame_no + self.n_decor].frame
+            frame = frames[frame_no + self.n_decor]
         except IndexError:
             return False
 
@@ -212,8 +203,8 @@ class IgnoreModuleQualname(IgnoreElem, attrs=["module", "qualname"]):
                 self.qualname,
             )
 
-    def match(self, frame_no: int, frameinfos: List[inspect.FrameInfo]) -> bool:
-        frame = frameinfos[frame_no].frame
+    def match(self, frame_no: int, frames: List[FrameType]) -> bool:
+        frame = frames[frame_no]
         module = cached_getmodule(frame.f_code)
 
         # Return earlier to avoid qualname uniqueness check
@@ -225,40 +216,42 @@ class IgnoreModuleQualname(IgnoreElem, attrs=["module", "qualname"]):
         ):
             return False
 
-        source = Source.for_frame(frame)
+        source = get_source_by_frame(frame)
         check_qualname_by_source(source, self.module.__name__, self.qualname)
 
-        return fnmatch(source.code_qualname(frame.f_code), self.qualname)
+        match_qualname = qualname_matcher(self.qualname)
+        return match_qualname(source.code_qualname(frame.f_code))
 
 
 class IgnoreFilenameQualname(IgnoreElem, attrs=["filename", "qualname"]):
     """Ignore calls with given qualname in the module with the filename"""
 
-    def match(self, frame_no: int, frameinfos: List[inspect.FrameInfo]) -> bool:
-        frame = frameinfos[frame_no].frame
+    def match(self, frame_no: int, frames: List[FrameType]) -> bool:
+        frame = frames[frame_no]
 
-        frame_filename = path.realpath(frame.f_code.co_filename)
-        preset_filename = path.realpath(self.filename)
+        frame_filename = cached_realpath(frame.f_code.co_filename)
+        preset_filename = cached_realpath(self.filename)
         # return earlier to avoid qualname uniqueness check
         if frame_filename != preset_filename:
             return False
 
-        source = Source.for_frame(frame)
+        source = get_source_by_frame(frame)
         check_qualname_by_source(source, self.filename, self.qualname)
 
-        return fnmatch(source.code_qualname(frame.f_code), self.qualname)
+        match_qualname = qualname_matcher(self.qualname)
+        return match_qualname(source.code_qualname(frame.f_code))
 
 
 class IgnoreOnlyQualname(IgnoreElem, attrs=["_none", "qualname"]):
     """Ignore calls that match the given qualname, across all frames."""
 
-    def match(self, frame_no: int, frameinfos: List[inspect.FrameInfo]) -> bool:
-        frame = frameinfos[frame_no].frame
+    def match(self, frame_no: int, frames: List[FrameType]) -> bool:
+        frame = frames[frame_no]
 
         # module is None, check qualname only
-        return fnmatch(
-            Source.for_frame(frame).code_qualname(frame.f_code), self.qualname
-        )
+        source = get_source_by_frame(frame)
+        match_qualname = qualname_matcher(self.qualname)
+        return match_qualname(source.code_qualname(frame.f_code))
 
 
 def create_ignore_elem(ignore_elem: IgnoreElemType) -> IgnoreElem:
@@ -292,6 +285,22 @@ def create_ignore_elem(ignore_elem: IgnoreElemType) -> IgnoreElem:
     raise ValueError(f"Unexpected ignore item: {ignore_elem!r}")
 
 
+def is_cacheable_elem(ignore_elem: IgnoreElemType) -> bool:
+    """Whether the ignore element can be cached by `IgnoreList.create()`
+
+    Not for relative paths, which depend on the working directory, and not
+    for local functions (created again every time their enclosing function
+    is called) or bound methods (holding their instances), which the cache
+    would keep alive.
+    """
+    elem = ignore_elem[0] if isinstance(ignore_elem, tuple) else ignore_elem
+    if isinstance(elem, (Path, str)):
+        return path.isabs(elem)
+    if isinstance(elem, MethodType):
+        return False
+    return "<locals>" not in getattr(elem, "__qualname__", "")
+
+
 class IgnoreList:
     """The ignore list to match the frames to see if they should be ignored"""
 
@@ -319,7 +328,44 @@ class IgnoreList:
         ignore = ignore or []
         if not isinstance(ignore, list):
             ignore = [ignore]
+        ignore = tuple(ignore)
+        for ignore_elem in ignore:
+            if hasattr(ignore_elem, "__code__"):
+                warn_if_maybe_decorated(ignore_elem)  # type: ignore
 
+        try:
+            hash(ignore)
+        except TypeError:
+            # Can't be cached, let create_ignore_elem() complain about
+            # the unexpected ignore items
+            cacheable = False
+        else:
+            cacheable = all(map(is_cacheable_elem, ignore))
+
+        if cacheable:
+            ignore_list = cls._create(ignore, ignore_lambda, ignore_varname)
+        else:
+            ignore_list = cls._create.__wrapped__(
+                cls, ignore, ignore_lambda, ignore_varname
+            )
+
+        debug_ignore_frame(">>> IgnoreList initiated <<<")
+        return ignore_list
+
+    @classmethod
+    @lru_cache()
+    def _create(
+        cls,
+        ignore: Tuple[IgnoreElemType, ...],
+        ignore_lambda: bool,
+        ignore_varname: bool,
+    ) -> "IgnoreList":
+        """Create an IgnoreList object, cached by the arguments of `create()`
+
+        The ignore elements are checked and set up (i.e. the uniqueness of
+        qualnames) only once for the same arguments, instead of every time
+        when `varname()`, `argname()`, etc are called.
+        """
         ignore_list = [
             IgnoreStdlib(STANDLIB_PATH)  # type: ignore
         ]  # type: List[IgnoreElem]
@@ -332,13 +378,19 @@ class IgnoreList:
 
         return cls(ignore_list)  # type: ignore
 
-    def __init__(self, ignore_list: List[IgnoreElemType]) -> None:
+    def __init__(self, ignore_list: List[IgnoreElem]) -> None:
         self.ignore_list = ignore_list
-        debug_ignore_frame(">>> IgnoreList initiated <<<")
+        # IgnoreDecorated needs the frames of the decorators ahead
+        self.lookahead = max(
+            (
+                ignore_elem.n_decor
+                for ignore_elem in ignore_list
+                if isinstance(ignore_elem, IgnoreDecorated)
+            ),
+            default=0,
+        )
 
-    def nextframe_to_check(
-        self, frame_no: int, frameinfos: List[inspect.FrameInfo]
-    ) -> int:
+    def nextframe_to_check(self, frame_no: int, frames: List[FrameType]) -> int:
         """Find the next frame to check
 
         In modst cases, the next frame to check is the next adjacent frame.
@@ -347,22 +399,22 @@ class IgnoreList:
 
         Args:
             frame_no: The index of current frame to check
-            frameinfos: The frame info objects
+            frames: The frames, from the innermost to the outermost
 
         Returns:
             A number for Next `N`th frame to check. 0 if no frame matched.
         """
         for ignore_elem in self.ignore_list:
-            matched = ignore_elem.match(frame_no, frameinfos)  # type: ignore
+            matched = ignore_elem.match(frame_no, frames)  # type: ignore
             if matched and isinstance(ignore_elem, IgnoreDecorated):
                 debug_ignore_frame(
-                    f"Ignored by {ignore_elem!r}", frameinfos[frame_no]
+                    f"Ignored by {ignore_elem!r}", frames[frame_no]
                 )
                 return ignore_elem.n_decor + 1
 
             if matched:
                 debug_ignore_frame(
-                    f"Ignored by {ignore_elem!r}", frameinfos[frame_no]
+                    f"Ignored by {ignore_elem!r}", frames[frame_no]
                 )
                 return 1
         return 0
@@ -382,10 +434,20 @@ class IgnoreList:
         try:
             # since this function will be called by APIs
             # so we should skip that
-            frames = inspect.getouterframes(sys._getframe(2), 0)
+            frame = sys._getframe(2)
+            frames = []  # type: List[FrameType]
             i = 0
 
-            while i < len(frames):
+            while True:
+                # Walk the frames directly and lazily, only as far as needed.
+                # Building FrameInfo objects for all of them (i.e. by
+                # inspect.getouterframes()) is way more expensive
+                while frame is not None and len(frames) <= i + self.lookahead:
+                    frames.append(frame)
+                    frame = frame.f_back
+                if i >= len(frames):
+                    break
+
                 nextframe = self.nextframe_to_check(i, frames)
                 # ignored
                 if nextframe > 0:
@@ -395,7 +457,7 @@ class IgnoreList:
                 frame_no -= 1
                 if frame_no == 0:
                     debug_ignore_frame("Gotcha!", frames[i])
-                    return frames[i].frame
+                    return frames[i]
 
                 debug_ignore_frame(
                     f"Skipping ({frame_no - 1} more to skip)", frames[i]
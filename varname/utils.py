@@ -9,15 +9,19 @@ Attributes:
         Espectially for modules that can't be retrieved by
         `inspect.getmodule(frame)`
 """
+import re
 import sys
+import __future__
 import ast
 import warnings
 import inspect
 from os import path
 from pathlib import Path
+from fnmatch import translate
 from functools import lru_cache, singledispatch
-from types import ModuleType, FunctionType, CodeType, FrameType
-from typing import Tuple, Union, List, Mapping, Callable
+from weakref import WeakKeyDictionary
+from types import ModuleType, FunctionType, MethodType, CodeType, FrameType
+from typing import Tuple, Type, Union, List, Dict, Mapping, Callable, Hashable
 
 from executing import Source
 
@@ -127,6 +131,60 @@ def cached_getmodule(codeobj: CodeType):
     return inspect.getmodule(codeobj)
 
 
+def cached_realpath(filename: Union[str, Path]) -> str:
+    """Cached version of os.path.realpath
+
+    Resolving the symbolic links takes a system call for each component of
+    the path, which adds up since it is done for every frame checked.
+    Only absolute paths are cached, since relative ones change with the
+    working directory.
+    """
+    if path.isabs(filename):
+        return _cached_realpath(filename)
+    return path.realpath(filename)
+
+
+@lru_cache()
+def _cached_realpath(filename: Union[str, Path]) -> str:
+    """Cached os.path.realpath for absolute paths"""
+    return path.realpath(filename)
+
+
+def warn_if_maybe_decorated(func: FunctionType) -> None:
+    """Warn if a function to ignore may be decorated
+
+    Repeated warnings are left to the warning filters to deal with.
+    """
+    if (
+        # without functools.wraps
+        "<locals>" in func.__qualname__
+        or func.__name__ != func.__code__.co_name
+    ):
+        warnings.warn(
+            f"You asked varname to ignore function {func.__name__!r}, "
+            "which may be decorated. If it is not intended, you may need "
+            "to ignore all intermediate frames with a tuple of "
+            "the function and the number of its decorators.",
+            MaybeDecoratedFunctionWarning,
+        )
+
+
+@lru_cache()
+def cached_compile(source: str, filename: str) -> CodeType:
+    """Cached version of compile(source, filename, "exec")
+
+    Used by `exec_code()`, so the code is compiled with the future features
+    of `varname.helpers` (i.e. `annotations`), as if it was compiled there.
+    """
+    return compile(
+        source,
+        filename,
+        "exec",
+        flags=__future__.annotations.compiler_flag,
+        dont_inherit=True,
+    )
+
+
 def get_node(
     frame: int,
     ignore: IgnoreType = None,
@@ -172,6 +230,17 @@ def get_node_by_frame(frame: FrameType, raise_exc: bool = True) -> ast.AST:
     return None
 
 
+def get_source_by_frame(frame: FrameType) -> Source:
+    """Get the source object of the file where the frame is executing
+
+    Unlike `Source.for_frame()`, which checks the file with linecache and
+    looks up the parsed source by all the lines of the file every time, this
+    is looked up from the cache of `Source.executing()` by the code object
+    and the last instruction of the frame.
+    """
+    return Source.executing(frame).source
+
+
 def lookfor_parent_assign(node: ast.AST, strict: bool = True) -> AssignType:
     """Look for an ast.Assign node in the parents"""
     while hasattr(node, "parent"):
@@ -289,19 +358,60 @@ def check_qualname_by_source(
         )
 
 
-def debug_ignore_frame(msg: str, frameinfo: inspect.FrameInfo = None) -> None:
-    """Print the debug message for a given frame info object
+@lru_cache()
+def qualname_matcher(qualname: str) -> Callable[[str], bool]:
+    """Get a function to match qualnames with a qualname to ignore
+
+    The qualname to ignore can have Unix shell-style wildcards. Without them,
+    the qualnames are compared directly. Otherwise, the pattern is compiled
+    once into a regex, rather than being matched with `fnmatch` each time.
+    """
+    qualname = path.normcase(qualname)
+    if not any(char in qualname for char in "*?["):
+        return lambda name: path.normcase(name) == qualname
+
+    pattern = re.compile(translate(qualname))
+    return lambda name: pattern.match(path.normcase(name)) is not None
+
+
+def warn_at_frame(
+    message: str, category: Type[Warning], frame: FrameType
+) -> None:
+    """Warn at the line where the frame is executing
+
+    The frame is already at hand, so `warnings.warn()` doesn't need to walk
+    the stack for it. The warning is also attributed to the user's code, so
+    that it is shown once for each location with the default filter,
+    using the registry of the module.
+
+    Like `warnings.warn()`, the module is `"<string>"` if the globals don't
+    have `__name__` (i.e. `exec(code, {...})`), otherwise `warn_explicit()`
+    would drop the warning silently.
+    """
+    warnings.warn_explicit(
+        message,
+        category,
+        filename=frame.f_code.co_filename,
+        lineno=frame.f_lineno,
+        module=frame.f_globals.get("__name__", "<string>"),
+        registry=frame.f_globals.setdefault("__warningregistry__", {}),
+        module_globals=frame.f_globals,
+    )
+
+
+def debug_ignore_frame(msg: str, frame: FrameType = None) -> None:
+    """Print the debug message for a given frame
 
     Args:
         msg: The debugging message
-        frameinfo: The FrameInfo object for the frame
+        frame: The frame
     """
     if not config.debug:
         return
-    if frameinfo is not None:
+    if frame is not None:
         msg = (
-            f"{msg} [In {frameinfo.function!r} at "
-            f"{frameinfo.filename}:{frameinfo.lineno}]"
+            f"{msg} [In {frame.f_code.co_name!r} at "
+            f"{frame.f_code.co_filename}:{frame.f_lineno}]"
         )
     sys.stderr.write(f"[{__package__}] DEBUG: {msg}\n")
 
@@ -347,6 +457,52 @@ def argnode_source(
     return source.asttokens().get_text(node)
 
 
+def signature_with_varargs(
+    func: Callable,
+) -> Tuple[inspect.Signature, str, str]:
+    """Get the signature of a function, together with the names of its
+    `*args` and `**kwargs` parameters (`None` if it doesn't have them)"""
+    signature = inspect.signature(func, follow_wrapped=False)
+    var_positional = var_keyword = None
+    for parameter in signature.parameters.values():
+        if parameter.kind == inspect.Parameter.VAR_POSITIONAL:
+            var_positional = parameter.name
+        elif parameter.kind == inspect.Parameter.VAR_KEYWORD:
+            var_keyword = parameter.name
+    return signature, var_positional, var_keyword
+
+
+# The signatures by the functions, see cached_signature_with_varargs()
+SIGNATURE_CACHE: (
+    "WeakKeyDictionary[FunctionType, Dict[bool, Tuple[inspect.Signature, str, str]]]"
+) = WeakKeyDictionary()
+
+
+def cached_signature_with_varargs(
+    func: FunctionType, bound: bool
+) -> Tuple[inspect.Signature, str, str]:
+    """Cached version of signature_with_varargs for functions
+
+    When `bound` is True, get the signature of the method bound from the
+    function, that is, without the first parameter (unless it's `*args`).
+    This way, the instances are not kept alive by the cache. The functions
+    are weakly referenced, so they are not kept alive either (i.e. closures).
+    """
+    signatures = SIGNATURE_CACHE.setdefault(func, {})
+    try:
+        return signatures[bound]
+    except KeyError:
+        pass
+
+    signature, var_positional, var_keyword = signature_with_varargs(func)
+    if bound:
+        parameters = list(signature.parameters.values())
+        if parameters[0].kind != inspect.Parameter.VAR_POSITIONAL:
+            signature = signature.replace(parameters=parameters[1:])
+    signatures[bound] = signature, var_positional, var_keyword
+    return signatures[bound]
+
+
 def get_argument_sources(
     source: Source,
     node: ast.Call,
@@ -364,7 +520,16 @@ def get_argument_sources(
     >>> # argument_sources = {'a': 'y', 'b', 'x', 'c': ast.Num(n=1)}
     """
     # <Signature (a, b, c, d=4)>
-    signature = inspect.signature(func, follow_wrapped=False)
+    if isinstance(func, MethodType) and isinstance(func.__func__, FunctionType):
+        signature, var_positional, var_keyword = cached_signature_with_varargs(
+            func.__func__, True
+        )
+    elif isinstance(func, FunctionType):
+        signature, var_positional, var_keyword = cached_signature_with_varargs(
+            func, False
+        )
+    else:
+        signature, var_positional, var_keyword = signature_with_varargs(func)
     # func(y, x, c=z)
     # ['y', 'x'], {'c': 'z'}
     arg_sources = [
@@ -379,14 +544,94 @@ def get_argument_sources(
     argument_sources = bound_args.arguments
     # see if *args and **kwargs have anything assigned
     # if not, assign () and {} to them
-    for parameter in signature.parameters.values():
-        if parameter.kind == inspect.Parameter.VAR_POSITIONAL:
-            argument_sources.setdefault(parameter.name, ())
-        if parameter.kind == inspect.Parameter.VAR_KEYWORD:
-            argument_sources.setdefault(parameter.name, {})
+    if var_positional is not None:
+        argument_sources.setdefault(var_positional, ())
+    if var_keyword is not None:
+        argument_sources.setdefault(var_keyword, {})
     return argument_sources
 
 
+# The argument sources by the functions and then the call sites,
+# see get_argument_sources_by_frame()
+ARGUMENT_SOURCES_CACHE_SIZE = 1024
+ARGUMENT_SOURCES_CACHE: (
+    "WeakKeyDictionary[FunctionType, Dict[Hashable, Mapping[str, ArgSourceType]]]"
+) = WeakKeyDictionary()
+
+
+def get_argument_sources_by_frame(
+    frame: FrameType,
+    node: ast.Call,
+    func: Callable,
+    vars_only: bool,
+) -> Mapping[str, ArgSourceType]:
+    """Get the sources for argument from an ast.Call node in the frame,
+    cached by the call site.
+
+    The node is determined by the code and the last instruction of the frame,
+    so the sources only change with the target function (its signature) and
+    `vars_only`. Bound methods are cached by their underlying functions, so
+    that the instances are not kept alive by the cache. The functions are
+    weakly referenced, so they are not kept alive either (i.e. closures).
+    Other callables are not cached. At most `ARGUMENT_SOURCES_CACHE_SIZE`
+    call sites are cached for a function, the earliest ones are dropped first.
+
+    Note that the returned mapping is shared by the calls from the same site,
+    and should not be modified.
+    """
+    if isinstance(func, MethodType) and isinstance(func.__func__, FunctionType):
+        function, bound = func.__func__, True
+    elif isinstance(func, FunctionType):
+        function, bound = func, False
+    else:
+        return get_argument_sources(
+            get_source_by_frame(frame), node, func, vars_only
+        )
+
+    sites = ARGUMENT_SOURCES_CACHE.setdefault(function, {})
+    key = (frame.f_code, frame.f_lasti, bound, vars_only)
+    try:
+        return sites[key]
+    except KeyError:
+        pass
+
+    if len(sites) >= ARGUMENT_SOURCES_CACHE_SIZE:
+        del sites[next(iter(sites))]
+    sites[key] = get_argument_sources(
+        get_source_by_frame(frame), node, func, vars_only
+    )
+    return sites[key]
+
+
+@lru_cache()
+def parse_argname_arg(arg: str) -> Tuple[str, Union[str, int], bool]:
+    """Parse an argument name passed to `argname()`
+
+    >>> parse_argname_arg("a")        # ("a", None, False)
+    >>> parse_argname_arg("args[0]")  # ("args", 0, False)
+    >>> parse_argname_arg("kwargs[x]")  # ("kwargs", "x", False)
+    >>> parse_argname_arg("*args")    # ("args", None, True)
+
+    Returns:
+        The name of the argument, the subscript (`None` if not subscripted,
+        an int if it is a number) and whether it is starred.
+    """
+    name, bracket, subscript = arg.partition("[")
+    if (
+        bracket
+        and name.isidentifier()
+        and len(subscript) > 1
+        and subscript.endswith("]")
+    ):
+        subscript = subscript[:-1]
+        return name, int(subscript) if subscript.isdecimal() else subscript, False
+
+    if arg.startswith("*") and arg[1:].isidentifier():
+        return arg[1:], None, True
+
+    return arg, None, False
+
+
 def get_function_called_argname(frame: FrameType, node: ast.Call) -> Callable:
     """Get the function who called argname"""
     # variable
@@ -418,12 +663,13 @@ def get_function_called_argname(frame: FrameType, node: ast.Call) -> Callable:
             )
 
     # try eval
-    warnings.warn(
+    warn_at_frame(
         f"{pure_eval_fail_msg} "
         "Using 'eval' to get the function that calls 'argname'. "
         "Try calling it using a variable reference to the function, or "
         "passing the function to 'argname' explicitly.",
         UsingExecWarning,
+        frame,
     )
     expr = ast.Expression(node.func)
     code = compile(expr, "<ast-call>", "eval")